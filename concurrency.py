@@ -1,9 +1,12 @@
 import time
 from concurrent.futures import ProcessPoolExecutor
 
-def simulate_hands(n):
+def simulate_hands(n, verify_fraction=0.0):
     from main import Hand, Deck, CandidateCache
+    from crosscheck import CrossChecker, cached_result
     cache = CandidateCache()
+    checker = CrossChecker(verify_fraction, cached_result(cache))
+    timestamp = time.perf_counter()
     wins = 0
     hands_with_straights = 0
     hands_with_sets = 0
@@ -20,19 +23,26 @@ def simulate_hands(n):
             hands_with_jokers += 1
         if len(hand.qualifying_plays()) > 0:
             hands_qualifying += 1
-        if hand.get_winning_plays() is not None:
+        winning = hand.get_winning_plays() is not None
+        if winning:
             wins += 1
-    return wins, hands_with_straights, hands_with_sets, hands_with_jokers, hands_qualifying
+        checker.maybe_check(hand, hand.plays, winning)
+    checked, mismatches, reference_time = checker.stats()
+    elapsed = time.perf_counter() - timestamp
+    return (wins, hands_with_straights, hands_with_sets, hands_with_jokers, hands_qualifying,
+            checked, mismatches, reference_time, elapsed)
 
 def main():
+    from crosscheck import configured_verify_fraction
     total_hands = 10**6
     num_workers = 8
     hands_per_worker = total_hands // num_workers
+    verify_fraction = configured_verify_fraction()
 
     timestamp = time.time()
 
     with ProcessPoolExecutor(max_workers=num_workers) as executor:
-        results = executor.map(simulate_hands, [hands_per_worker] * num_workers)
+        results = executor.map(simulate_hands, [hands_per_worker] * num_workers, [verify_fraction] * num_workers)
 
 
     winning_hands = 0
@@ -40,8 +50,17 @@ def main():
     with_sets = 0
     with_jokers = 0
     qualifying_hands = 0
+    checked_hands = 0
+    mismatching_hands = []
+    reference_time = 0.0
+    worker_time = 0.0
     for result in results:
-        wins, hands_with_straights, hands_with_sets, hands_with_jokers, hands_qualifying = result
+        (wins, hands_with_straights, hands_with_sets, hands_with_jokers, hands_qualifying,
+         checked, mismatches, check_time, elapsed) = result
+        checked_hands += checked
+        mismatching_hands.extend(mismatches)
+        reference_time += check_time
+        worker_time += elapsed
         winning_hands += wins
         with_straights += hands_with_straights
         with_sets += hands_with_sets
@@ -62,6 +81,13 @@ def main():
     print(f"Joker rate: {with_jokers / total_hands}")
     print(f"Hands qualifying: {qualifying_hands}")
     print(f"Qualification rate: {qualifying_hands / total_hands}")
+    if verify_fraction > 0:
+        print("-" * 50)
+        print(f"Cross-checked hands: {checked_hands}")
+        print(f"Mismatching hands: {len(mismatching_hands)}")
+        for hand in mismatching_hands:
+            print(f"  {hand}")
+        print(f"Cross-check overhead: {reference_time / (worker_time - reference_time)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import random
+import time
+
+VERIFY_FRACTION = 0.001
+
+
+def configured_verify_fraction():
+    # VERIFY_FRACTION in the environment overrides the default sampled fraction
+    value = os.environ.get("VERIFY_FRACTION")
+    if value is None:
+        return VERIFY_FRACTION
+    try:
+        fraction = float(value)
+    except ValueError:
+        raise ValueError(f"VERIFY_FRACTION must be a number between 0 and 1, got {value!r}") from None
+    if not 0 <= fraction <= 1:
+        raise ValueError(f"VERIFY_FRACTION must be between 0 and 1, got {fraction}")
+    return fraction
+
+
+def play_strings(plays):
+    return frozenset(str(play) for play in plays)
+
+
+def reference_result(hand_string):
+    # evaluates without any cache or pre-filter, the behaviour the optimized paths must keep
+    from main import Hand
+    hand = Hand.from_string(hand_string)
+    return play_strings(hand.plays), hand.get_winning_plays() is not None
+
+
+def cached_result(cache):
+    def evaluate(hand_string):
+        from main import Hand
+        hand = Hand.from_string(hand_string)
+        hand.cache = cache
+        return hand.plays, hand.get_winning_plays() is not None
+    return evaluate
+
+
+def minimize_hand(hand_string, is_mismatch):
+    # greedily drop cards as long as the mismatch persists
+    cards = hand_string.split("|")
+    changed = True
+    while changed and len(cards) > 1:
+        changed = False
+        for i in range(len(cards)):
+            reduced = "|".join(cards[:i] + cards[i + 1:])
+            if is_mismatch(reduced):
+                cards = cards[:i] + cards[i + 1:]
+                changed = True
+                break
+    return "|".join(cards)
+
+
+class CrossChecker:
+
+    def __init__(self, fraction, fast_result, seed=None):
+        # fast_result(hand_string) -> (plays or None, winning) is the optimized path under test
+        self.fraction = fraction
+        self.fast_result = fast_result
+        self.random = random.Random(seed)
+        self.checked = 0
+        self.mismatches = []
+        self.reference_time = 0.0
+
+    def sample(self):
+        return self.fraction > 0 and self.random.random() < self.fraction
+
+    def maybe_check(self, hand, fast_plays, fast_winning):
+        if self.sample():
+            self.check(hand, fast_plays, fast_winning)
+
+    def check(self, hand, fast_plays, fast_winning):
+        # fast_plays may be None if the optimized path decided without building plays
+        timestamp = time.perf_counter()
+        hand_string = str(hand)
+        plays, winning = reference_result(hand_string)
+        self.checked += 1
+
+        if fast_winning != winning:
+            minimal = minimize_hand(hand_string, self.verdicts_differ)
+            self.report(hand_string, f"win verdict fast={fast_winning} reference={winning}", minimal)
+        elif fast_plays is not None and play_strings(fast_plays) != plays:
+            minimal = minimize_hand(hand_string, self.plays_differ)
+            self.report(hand_string, "play sets differ", minimal)
+        self.reference_time += time.perf_counter() - timestamp
+
+    def verdicts_differ(self, hand_string):
+        return self.fast_result(hand_string)[1] != reference_result(hand_string)[1]
+
+    def plays_differ(self, hand_string):
+        fast_plays = self.fast_result(hand_string)[0]
+        return fast_plays is not None and play_strings(fast_plays) != reference_result(hand_string)[0]
+
+    def report(self, hand_string, reason, minimal):
+        print(f"MISMATCH ({reason}): {hand_string} minimal: {minimal}")
+        self.mismatches.append(minimal)
+
+    def stats(self):
+        return self.checked, self.mismatches, self.reference_time
@@ -0,0 +1,211 @@
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Cards are indexed in Deck() order: index = value * 8 + suit * 2 + copy for the
+# 104 regular cards (suit in Suit.non_joker_suits() order), 104..109 are jokers.
+DECK_SIZE = 110
+NR_OF_VALUES = 13
+NR_OF_SUITS = 4
+FIRST_JOKER = 104
+# get_winning_plays looks for wins made of at most 4 plays
+MAX_WINNING_PLAYS = 4
+
+
+def card_from_index(index):
+    from main import Card, Suit, VALUES
+    if index >= FIRST_JOKER:
+        return Card(Suit.JOKER, "X")
+    return Card(Suit.non_joker_suits()[(index % 8) // 2], VALUES[index // 8])
+
+
+def hand_from_indices(indices, cache=None):
+    from main import Hand
+    hand = Hand(size=len(indices), cache=cache)
+    hand.cards = [card_from_index(int(index)) for index in indices]
+    return hand
+
+
+def indices_from_hand(hand):
+    from main import Suit, VALUES
+    indices = []
+    next_joker = FIRST_JOKER
+    for card in hand.cards:
+        if card.is_joker():
+            indices.append(next_joker)
+            next_joker += 1
+            continue
+        index = VALUES.index(card.value) * 8 + Suit.non_joker_suits().index(card.suit) * 2
+        if index in indices:
+            index += 1
+        indices.append(index)
+    return np.array(indices)
+
+
+def draw_hands(n, size=13, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    return np.argpartition(rng.random((n, DECK_SIZE)), size, axis=1)[:, :size]
+
+
+def card_counts(hands):
+    hands = np.asarray(hands)
+    if hands.shape[1] == DECK_SIZE:
+        counts = hands.astype(np.int8)
+    else:
+        counts = np.zeros((len(hands), DECK_SIZE), dtype=np.int8)
+        np.put_along_axis(counts, hands, 1, axis=1)
+    return counts
+
+
+def extract_features(hands):
+    # hands: (N, 13) card indices or (N, 110) card membership
+    counts = card_counts(hands)
+    n = len(counts)
+    # (N, suit, value) number of copies held of each regular card
+    suit_value_counts = counts[:, :FIRST_JOKER].reshape(n, NR_OF_VALUES, NR_OF_SUITS, 2).sum(axis=3).transpose(0, 2, 1)
+    suit_masks = suit_value_counts > 0
+    jokers = counts[:, FIRST_JOKER:].sum(axis=1)
+    value_counts = suit_value_counts.sum(axis=1)
+
+    return {
+        "suit_value_counts": suit_value_counts,
+        "suit_masks": suit_masks,
+        "value_counts": value_counts,
+        "joker_counts": jokers,
+        "has_jokers": jokers > 0,
+        "has_set_candidates": (value_counts + jokers[:, None] >= 3).any(axis=1),
+        "longest_runs": longest_runs_with_jokers(suit_masks, jokers),
+    }
+
+
+def straight_windows(suit_masks, jokers, window_size):
+    # valid[n, suit, start]: the cyclic window start..start+window_size-1 can be
+    # completed to a straight, same joker rules as is_straight
+    doubled = np.concatenate([suit_masks, suit_masks], axis=2)
+    windows = sliding_window_view(doubled, window_size, axis=2)[:, :, :NR_OF_VALUES]
+    missing = window_size - windows.sum(axis=3)
+    gaps = ~windows
+    adjacent_jokers = (gaps[..., :-1] & gaps[..., 1:]).any(axis=3)
+    jokers_at_both_ends = gaps[..., 0] & gaps[..., -1]
+    return (missing <= jokers[:, None, None]) & ~adjacent_jokers & ~jokers_at_both_ends
+
+
+def longest_runs_with_jokers(suit_masks, jokers):
+    longest = np.zeros(suit_masks.shape[:2], dtype=np.int8)
+    for window_size in range(3, NR_OF_VALUES + 1):
+        valid = straight_windows(suit_masks, jokers, window_size).any(axis=2)
+        longest[valid] = window_size
+    return longest
+
+
+def usable_card_counts(features):
+    suit_masks = features["suit_masks"]
+    jokers = features["joker_counts"]
+
+    # every card of a valid straight lies in a valid window of 3 within it
+    valid_starts = straight_windows(suit_masks, jokers, 3)
+    in_straight = suit_masks & (valid_starts | np.roll(valid_starts, 1, axis=2) | np.roll(valid_starts, 2, axis=2))
+
+    distinct_suits = suit_masks.sum(axis=1)
+    in_set = distinct_suits + np.minimum(jokers, 2)[:, None] >= 3
+
+    # Play.contradicts lets any number of plays share a card the hand holds twice,
+    # so a doubled card can fill a slot in several plays of a win
+    copies = features["suit_value_counts"]
+    shared = np.where(copies > 1, MAX_WINNING_PLAYS, copies)
+
+    # every straight holding a card also holds its suit neighbour below or above,
+    # either the real card or a joker, so those bound how many straights share it
+    neighbours = shared + jokers[:, None, None]
+    straights_per_card = in_straight * (np.roll(neighbours, 1, axis=2) + np.roll(neighbours, -1, axis=2))
+    # every set holding a card has two more slots of the same value in other suits or jokers
+    other_suits = shared.sum(axis=1, keepdims=True) - shared + jokers[:, None, None]
+    sets_per_card = in_set[:, None, :] * (other_suits // 2)
+
+    plays_per_card = np.minimum(straights_per_card + sets_per_card, MAX_WINNING_PLAYS)
+    slots = np.minimum(plays_per_card, np.where(copies > 1, MAX_WINNING_PLAYS, copies))
+    return slots.sum(axis=(1, 2)) + jokers
+
+
+def cannot_win(features):
+    # a win fills 12 slots with plays, so the cards that fit into some straight
+    # or set must be able to fill at least 12 slots
+    return usable_card_counts(features) < 12
+
+
+def count_wins(hands, cache=None, checker=None):
+    features = extract_features(hands)
+    if np.shape(hands)[1] == DECK_SIZE:
+        hands = [np.flatnonzero(row) for row in hands]
+    filtered = cannot_win(features)
+    if checker is not None:
+        for i in np.flatnonzero(filtered):
+            if checker.sample():
+                checker.check(hand_from_indices(hands[i]), None, False)
+
+    survivors = np.flatnonzero(~filtered)
+    wins = 0
+    for i in survivors:
+        hand = hand_from_indices(hands[i], cache=cache)
+        winning = hand.get_winning_plays() is not None
+        if winning:
+            wins += 1
+        if checker is not None:
+            checker.maybe_check(hand, hand.plays, winning)
+    return wins, len(survivors)
+
+
+def prefiltered_result(cache=None):
+    def evaluate(hand_string):
+        from main import Hand
+        hand = Hand.from_string(hand_string)
+        if cannot_win(extract_features([indices_from_hand(hand)]))[0]:
+            return None, False
+        hand.cache = cache
+        return hand.plays, hand.get_winning_plays() is not None
+    return evaluate
+
+
+def count_wins_unfiltered(hands, cache=None):
+    wins = 0
+    for indices in hands:
+        if hand_from_indices(indices, cache=cache).get_winning_plays() is not None:
+            wins += 1
+    return wins
+
+
+def main():
+    from main import CandidateCache
+    from crosscheck import CrossChecker, configured_verify_fraction
+    total_hands = 10**5
+    baseline_hands = 2000
+    cache = CandidateCache()
+    checker = CrossChecker(configured_verify_fraction(), prefiltered_result(cache))
+
+    timestamp = time.time()
+    hands = draw_hands(total_hands)
+    wins, survivors = count_wins(hands, cache=cache, checker=checker)
+    elapsed = time.time() - timestamp
+    print(elapsed)
+
+    # the unfiltered path on a sample of the same hands, for comparison
+    timestamp = time.time()
+    count_wins_unfiltered(hands[:baseline_hands], cache=cache)
+    baseline_elapsed = time.time() - timestamp
+
+    print("-" * 50)
+    print(f"Total hands: {total_hands}")
+    print(f"Hands surviving pre-filter: {survivors}")
+    print(f"Survival rate: {survivors / total_hands}")
+    print(f"Winning hands: {wins}")
+    print(f"Winrate: {wins / total_hands}")
+    print(f"Throughput with pre-filter: {total_hands / elapsed} hands/s")
+    print(f"Throughput without pre-filter: {baseline_hands / baseline_elapsed} hands/s")
+    print(f"Speedup: {(total_hands / elapsed) / (baseline_hands / baseline_elapsed)}")
+    checked, mismatches, reference_time = checker.stats()
+    print(f"Cross-checked hands: {checked}")
+    print(f"Mismatching hands: {len(mismatches)}")
+    print(f"Cross-check overhead: {reference_time / (elapsed - reference_time)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH_SIZE = 64
+MAX_BATCH_DELAY = 0.002
+LATENCY_WINDOW = 10000
+
+_worker_cache = None
+
+
+def init_worker():
+    global _worker_cache
+    from main import CandidateCache
+    _worker_cache = CandidateCache()
+
+
+def evaluate_hand(hand_string):
+    from main import Hand, Suit, VALUES
+    try:
+        hand = Hand.from_string(hand_string)
+    except (IndexError, ValueError) as e:
+        return {"hand": hand_string, "error": f"invalid hand: {e}"}
+    if len(hand.cards) != Hand().size:
+        return {"hand": hand_string, "error": f"invalid hand: expected {Hand().size} cards, got {len(hand.cards)}"}
+    if any(card.suit is None for card in hand.cards):
+        return {"hand": hand_string, "error": "invalid hand: unknown suit"}
+    if any((card.value == "X") != (card.suit == Suit.JOKER) for card in hand.cards):
+        return {"hand": hand_string, "error": "invalid hand: jokers must be written as XX"}
+    if any(not card.is_joker() and card.value not in VALUES for card in hand.cards):
+        return {"hand": hand_string, "error": "invalid hand: unknown value"}
+    hand.cache = _worker_cache
+    winning = hand.get_winning_plays()
+    return {
+        "hand": str(hand),
+        "winning": winning is not None,
+        "winning_plays": [str(play) for play in winning] if winning is not None else None,
+        "qualifying_plays": [str(play) for play in hand.qualifying_plays()],
+        "plays": [str(play) for play in hand.plays],
+    }
+
+
+def evaluate_batch(hand_strings):
+    results = []
+    for hand_string in hand_strings:
+        # one failing hand must not fail the rest of the batch
+        try:
+            results.append(evaluate_hand(hand_string))
+        except Exception as e:
+            results.append({"hand": hand_string, "error": f"evaluation failed: {e}"})
+    return results
+
+
+def percentile(sorted_values, p):
+    if len(sorted_values) == 0:
+        return None
+    index = min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))
+    return sorted_values[index]
+
+
+class EvaluationServer:
+
+    def __init__(self, executor, num_workers, max_batch_size=MAX_BATCH_SIZE, max_batch_delay=MAX_BATCH_DELAY):
+        self.executor = executor
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.queue = asyncio.Queue()
+        # one slot per worker, so hands wait in self.queue instead of the executor
+        self.free_workers = asyncio.Semaphore(num_workers)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.batches = 0
+        self.batched_hands = 0
+        self.in_flight = 0
+        self.tasks = set()
+
+    async def evaluate(self, hand_string):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((hand_string, future, time.perf_counter()))
+        return await future
+
+    async def run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.free_workers.acquire()
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            self.batched_hands += len(batch)
+            # split the batch over all workers that are free right now
+            workers = 1
+            while workers < len(batch) and not self.free_workers.locked():
+                await self.free_workers.acquire()
+                workers += 1
+            for i in range(workers):
+                task = loop.create_task(self.dispatch(batch[i::workers]))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    async def dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        self.in_flight += len(batch)
+        try:
+            results = await loop.run_in_executor(self.executor, evaluate_batch, [entry[0] for entry in batch])
+        except Exception as e:
+            results = [{"hand": entry[0], "error": f"evaluation failed: {e}"} for entry in batch]
+        finally:
+            self.in_flight -= len(batch)
+            self.free_workers.release()
+        now = time.perf_counter()
+        for (_, future, started), result in zip(batch, results):
+            self.latencies.append(now - started)
+            self.requests += 1
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.batched_hands / self.batches if self.batches > 0 else None,
+            "queue_depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "latency_ms": {
+                f"p{p}": (percentile(latencies, p) * 1000 if latencies else None)
+                for p in (50, 90, 99, 99.9)
+            },
+        }
+
+    async def handle_client(self, reader, writer):
+        # one request per line: a hand in Hand.from_string format, or STATS.
+        # Lines are read without waiting for earlier responses, so pipelined
+        # requests get batched together; responses are written in request order.
+        # STATS is taken when its response is written, after the requests before it.
+        responses = asyncio.Queue()
+        responder = asyncio.create_task(self.write_responses(responses, writer))
+        try:
+            while not responder.done():
+                line = await reader.readline()
+                if not line:
+                    break
+                request = line.decode().strip()
+                if not request:
+                    continue
+                if request.upper() == "STATS":
+                    response = self.stats
+                else:
+                    response = asyncio.ensure_future(self.evaluate(request))
+                await responses.put(response)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            await responses.put(None)
+            await responder
+            writer.close()
+
+    async def write_responses(self, responses, writer):
+        try:
+            while True:
+                response = await responses.get()
+                if response is None:
+                    return
+                result = response() if callable(response) else await response
+                writer.write((json.dumps(result, ensure_ascii=False) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def serve(host=HOST, port=PORT, unix_socket=None, num_workers=8,
+                max_batch_size=MAX_BATCH_SIZE, max_batch_delay=MAX_BATCH_DELAY):
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker) as executor:
+        server = EvaluationServer(executor, num_workers, max_batch_size, max_batch_delay)
+        batcher = asyncio.create_task(server.run_batches())
+        if unix_socket is not None:
+            listener = await asyncio.start_unix_server(server.handle_client, path=unix_socket)
+            print(f"Listening on {unix_socket}")
+        else:
+            if host not in ("127.0.0.1", "::1", "localhost"):
+                raise ValueError(f"refusing to listen on non-local host {host}")
+            listener = await asyncio.start_server(server.handle_client, host, port)
+            print(f"Listening on {host}:{port}")
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local hand evaluation server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix-socket", default=None)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-batch-delay-ms", type=float, default=MAX_BATCH_DELAY * 1000)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.unix_socket, args.workers,
+                      args.max_batch_size, args.max_batch_delay_ms / 1000))
+
+if __name__ == "__main__":
+    main()